@@ -0,0 +1,96 @@
+"""Regression tests for the Flask backend's conditional-request handling."""
+
+import pytest
+
+import flask_backend
+
+VALID_GEOMETRY = {
+    'type': 'Polygon',
+    'coordinates': [[
+        [36.80, -1.30],
+        [36.81, -1.30],
+        [36.81, -1.29],
+        [36.80, -1.29],
+        [36.80, -1.30]
+    ]]
+}
+
+# Large enough that the response body clears COMPRESS_MIN_SIZE and
+# Flask-Compress rewrites the ETag with its ':<algorithm>' suffix
+CANNED_RESULT = {
+    'summary': {
+        'field_area_hectares': 12.34,
+        'avg_ndvi': 0.612,
+        'avg_evi': 0.431,
+        'avg_ndwi': 0.152,
+        'avg_ndre': 0.301,
+        'health_zones': {'healthy': 70.0, 'moderate': 20.0, 'stressed': 10.0},
+        'recommendations': [
+            "Good vegetation health. Monitor for any declining trends." * 3,
+            "Adequate water content. Current irrigation schedule appears optimal." * 3,
+        ],
+        'analysis_date': '2026-09-01',
+        'image_count': 4
+    },
+    'geojson_overlay': {'type': 'FeatureCollection', 'features': []}
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Serve the canned result from the cache so no Earth Engine calls happen
+    monkeypatch.setattr(flask_backend, 'analysis_cache_get', lambda key: CANNED_RESULT)
+    flask_backend.app.config['TESTING'] = True
+    with flask_backend.app.test_client() as test_client:
+        yield test_client
+
+
+def test_compressed_etag_round_trip_yields_304(client):
+    """The ETag from a compressed response must revalidate to a 304.
+
+    Flask-Compress appends ':<algorithm>' to strong ETags, so the match in
+    analyze_field has to tolerate the suffix a browser echoes back.
+    """
+    first = client.post(
+        '/analyze_field',
+        json={'geometry': VALID_GEOMETRY},
+        headers={'Accept-Encoding': 'gzip'}
+    )
+    assert first.status_code == 200
+    assert first.headers.get('Content-Encoding') == 'gzip'
+    etag = first.headers['ETag']
+
+    second = client.post(
+        '/analyze_field',
+        json={'geometry': VALID_GEOMETRY},
+        headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag}
+    )
+    assert second.status_code == 304
+
+
+def test_uncompressed_etag_round_trip_yields_304(client):
+    """Clients that refuse compression get the bare ETag; it must still match."""
+    first = client.post(
+        '/analyze_field',
+        json={'geometry': VALID_GEOMETRY},
+        headers={'Accept-Encoding': 'identity'}
+    )
+    assert first.status_code == 200
+    assert first.headers.get('Content-Encoding') is None
+    etag = first.headers['ETag']
+
+    second = client.post(
+        '/analyze_field',
+        json={'geometry': VALID_GEOMETRY},
+        headers={'Accept-Encoding': 'identity', 'If-None-Match': etag}
+    )
+    assert second.status_code == 304
+
+
+def test_cache_key_matches_etag_suffix_tolerance():
+    assert flask_backend.cache_key_matches_etag('abc123', ['abc123'])
+    assert flask_backend.cache_key_matches_etag('abc123', ['abc123:gzip'])
+    assert flask_backend.cache_key_matches_etag('abc123', ['abc123:br'])
+    assert not flask_backend.cache_key_matches_etag('abc123', ['abc124'])
+    assert not flask_backend.cache_key_matches_etag('abc123', ['abc1234'])
+    assert not flask_backend.cache_key_matches_etag('abc123', [])